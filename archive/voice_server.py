@@ -2,9 +2,11 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
 from fastapi.responses import Response
 import os
 from dotenv import load_dotenv
-import json
-import base64
+import orjson
+import pybase64
 import asyncio
+import queue
+import time
 from elevenlabs.client import ElevenLabs
 from elevenlabs.conversational_ai.conversation import Conversation
 from elevenlabs.conversational_ai.default_audio_interface import DefaultAudioInterface
@@ -16,6 +18,86 @@ app = FastAPI()
 # Initialize ElevenLabs client
 elevenlabs_client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
 
+# Reusable frame buffers - decoding 50 frames/sec/call into fresh bytes
+# objects churns the allocator under concurrency, so a small LIFO pool
+# keeps hot buffers warm instead
+FRAME_BYTES = 160  # one 20ms frame of 8kHz mulaw
+_audio_buf_pool = queue.LifoQueue()
+for _ in range(64):
+    _audio_buf_pool.put(bytearray(FRAME_BYTES))
+
+def decode_frame(payload):
+    """Decode a base64 audio frame, reusing a pooled buffer when possible.
+
+    Returns (audio, buf). The caller must hand buf back to release_frame
+    once the audio has been consumed - ElevenLabs copies the bytes during
+    send_audio, so the buffer's lifetime ends when that call returns.
+    Newer pybase64 releases can decode straight into a caller buffer; on
+    older versions we fall back to a plain decode with no pooling.
+    """
+    if hasattr(pybase64, 'b64decode_into'):
+        try:
+            buf = _audio_buf_pool.get_nowait()
+        except queue.Empty:
+            buf = bytearray(FRAME_BYTES)
+        written = pybase64.b64decode_into(payload, buf)
+        return memoryview(buf)[:written], buf
+    return pybase64.b64decode(payload), None
+
+def release_frame(buf):
+    """Return a pooled frame buffer after its audio has been consumed"""
+    if buf is not None:
+        try:
+            _audio_buf_pool.put_nowait(buf)
+        except queue.Full:
+            pass
+
+# Pre-connected ElevenLabs sessions - starting a session inside the call
+# handler adds a full WSS handshake to the caller's first-audio latency,
+# so a few are kept warm and handed out as calls arrive
+SESSION_POOL_SIZE = 3
+SESSION_MAX_IDLE_SECONDS = 60  # recycle before ElevenLabs times us out
+_session_pool = asyncio.Queue()
+
+def _start_elevenlabs_session():
+    return elevenlabs_client.conversational_ai.conversation.start_session(
+        agent_id=os.getenv("ELEVENLABS_AGENT_ID")
+    )
+
+async def refill_session_pool():
+    """Top the pool back up to SESSION_POOL_SIZE warm sessions"""
+    while _session_pool.qsize() < SESSION_POOL_SIZE:
+        try:
+            conversation = await asyncio.to_thread(_start_elevenlabs_session)
+            await _session_pool.put((conversation, time.monotonic()))
+        except Exception as e:
+            print(f"Error prewarming ElevenLabs session: {e}")
+            break
+
+async def get_pooled_session():
+    """Take a warm session from the pool, or start one if it's empty.
+
+    Sessions idle past SESSION_MAX_IDLE_SECONDS are discarded - ElevenLabs
+    may already have closed them server-side.
+    """
+    while True:
+        try:
+            conversation, created_at = _session_pool.get_nowait()
+        except asyncio.QueueEmpty:
+            return await asyncio.to_thread(_start_elevenlabs_session)
+
+        if time.monotonic() - created_at <= SESSION_MAX_IDLE_SECONDS:
+            return conversation
+
+        try:
+            conversation.end_session()
+        except:
+            pass
+
+@app.on_event("startup")
+async def warm_session_pool():
+    asyncio.create_task(refill_session_pool())
+
 @app.get("/")
 async def root():
     return {"message": "Sally's Spa Voice Agent is running!"}
@@ -40,7 +122,17 @@ async def handle_incoming_call(request: Request):
 
 @app.websocket("/media-stream")
 async def media_stream_handler(websocket: WebSocket):
-    """Handle the media stream between Twilio and ElevenLabs"""
+    """Handle the media stream between Twilio and ElevenLabs
+
+    Transport note: Twilio Media Streams frames audio as base64 mulaw inside
+    JSON over a TCP WebSocket, so every 20ms frame pays base64 decode/encode
+    plus JSON framing in Python, and TCP head-of-line blocking adds jitter.
+    The long-term fix is to move this path to WebRTC (aiortc, or a SIP-to-
+    WebRTC bridge dialed via <Dial><Sip> instead of <Stream>) so audio flows
+    over UDP/SRTP without base64 or JSON. That is a transport replacement on
+    both the Twilio and ElevenLabs legs, not something this handler can do
+    alone - until then the work below keeps the per-frame Python cost down.
+    """
     await websocket.accept()
     print("WebSocket connection established")
     
@@ -48,18 +140,16 @@ async def media_stream_handler(websocket: WebSocket):
     conversation = None
     
     try:
-        # Create ElevenLabs conversation
-        agent_id = os.getenv("ELEVENLABS_AGENT_ID")
-        
-        conversation = elevenlabs_client.conversational_ai.conversation.start_session(
-            agent_id=agent_id
-        )
-        
+        # Grab a pre-connected ElevenLabs conversation - the WSS handshake
+        # already happened in the background, before this call arrived
+        conversation = await get_pooled_session()
+
         print(f"ElevenLabs conversation started: {conversation.conversation_id}")
         
         # Handle messages from Twilio
+        # orjson parses the 50 frames/sec JSON envelopes at C speed
         async for message in websocket.iter_text():
-            data = json.loads(message)
+            data = orjson.loads(message)
             
             if data["event"] == "start":
                 stream_sid = data["start"]["streamSid"]
@@ -69,27 +159,33 @@ async def media_stream_handler(websocket: WebSocket):
                 # Audio from caller (base64 encoded mulaw)
                 payload = data["media"]["payload"]
                 
-                # Decode and send to ElevenLabs
-                audio_bytes = base64.b64decode(payload)
-                
+                # Decode and send to ElevenLabs (pybase64 uses SIMD lookup
+                # tables - several times faster than stdlib base64 per frame)
+                audio_bytes, frame_buf = decode_frame(payload)
+
                 # Send audio to ElevenLabs conversation
-                response_audio = await process_with_elevenlabs(
-                    conversation, 
-                    audio_bytes
-                )
+                try:
+                    response_audio = await process_with_elevenlabs(
+                        conversation,
+                        audio_bytes
+                    )
+                finally:
+                    # send_audio has copied the frame - recycle the buffer
+                    release_frame(frame_buf)
                 
                 # Send response back to Twilio
                 if response_audio:
-                    # Encode for Twilio (mulaw base64)
-                    encoded_audio = base64.b64encode(response_audio).decode('utf-8')
-                    
-                    await websocket.send_json({
+                    # Encode for Twilio (mulaw base64) - b64encode_as_string
+                    # emits str directly, skipping the bytes->str round-trip
+                    encoded_audio = pybase64.b64encode_as_string(response_audio)
+
+                    await websocket.send_text(orjson.dumps({
                         "event": "media",
                         "streamSid": stream_sid,
                         "media": {
                             "payload": encoded_audio
                         }
-                    })
+                    }).decode())
                 
             elif data["event"] == "stop":
                 print(f"Twilio stream stopped: {stream_sid}")
@@ -106,6 +202,8 @@ async def media_stream_handler(websocket: WebSocket):
                 conversation.end_session()
             except:
                 pass
+        # Replace the session this call consumed
+        asyncio.create_task(refill_session_pool())
         await websocket.close()
 
 async def process_with_elevenlabs(conversation, audio_bytes):
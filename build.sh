@@ -20,6 +20,9 @@ cd ..
 # Build Chat Lambda
 echo "Building Chat Lambda..."
 cd lambda-chat
+# Bundle the MCP tool module so the chat Lambda can call tools in-process
+# instead of paying an inter-Lambda invoke per tool call
+cp ../lambda-mcp/lambda_function.py spa_tools.py
 pip3 install -r requirements.txt -t . \
   --platform manylinux2014_x86_64 \
   --implementation cp \
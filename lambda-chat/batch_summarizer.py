@@ -0,0 +1,134 @@
+"""Offline conversation summarization via the Anthropic Batch API.
+
+Long sessions make every chat turn replay a large history to Claude.
+This module runs outside the interactive request path (scheduled
+invocation or manual run) and uses the Batch API - billed at 50% of the
+synchronous price - to compress long conversations into a one-paragraph
+summary stored on the session's DynamoDB item. chat_with_claude then
+replays the summary plus recent turns instead of the full history.
+
+Usage (as a Lambda or from a shell with AWS credentials):
+    lambda_handler({'action': 'submit'}, None)   -> submits a batch, returns its id
+    lambda_handler({'action': 'collect', 'batch_id': '...'}, None)
+"""
+
+import os
+import boto3
+from anthropic import Anthropic
+
+anthropic_client = Anthropic(api_key=os.environ['ANTHROPIC_API_KEY'])
+dynamodb = boto3.resource('dynamodb')
+
+CONVERSATIONS_TABLE = os.environ.get('CONVERSATIONS_TABLE', 'spa-conversations')
+conversations_table = dynamodb.Table(CONVERSATIONS_TABLE)
+
+# Only sessions longer than this are worth summarizing
+SUMMARY_MIN_MESSAGES = 8
+
+SUMMARY_PROMPT = (
+    "Summarize this spa customer conversation in 2-3 sentences. "
+    "Keep the customer's name if given, which services they asked about, "
+    "and any preferences or follow-ups they mentioned."
+)
+
+def _conversation_text(messages: list) -> str:
+    """Flatten a stored message list into plain text for summarization"""
+    lines = []
+    for message in messages:
+        content = message.get('content')
+        if isinstance(content, str):
+            lines.append(f"{message['role']}: {content}")
+        elif isinstance(content, list):
+            # Assistant/tool messages store content blocks; keep the text ones
+            for block in content:
+                if isinstance(block, dict) and block.get('type') == 'text':
+                    lines.append(f"{message['role']}: {block['text']}")
+    return '\n'.join(lines)
+
+def submit_summary_batch() -> str:
+    """Scan for long sessions and submit one batch request per session.
+
+    Returns the batch id, or an empty string if nothing needed summarizing.
+    The session_id is used as the batch custom_id so results can be matched
+    back to their DynamoDB items.
+    """
+    requests = []
+
+    # Scan returns at most 1MB per page - follow LastEvaluatedKey so
+    # sessions beyond the first page still get summarized
+    scan_kwargs = {'ProjectionExpression': 'session_id, messages'}
+    while True:
+        scan = conversations_table.scan(**scan_kwargs)
+        for item in scan.get('Items', []):
+            messages = item.get('messages', [])
+            if len(messages) < SUMMARY_MIN_MESSAGES:
+                continue
+
+            requests.append({
+                'custom_id': item['session_id'],
+                'params': {
+                    'model': 'claude-3-5-haiku-20241022',
+                    'max_tokens': 200,
+                    'system': SUMMARY_PROMPT,
+                    'messages': [{
+                        'role': 'user',
+                        'content': _conversation_text(messages)
+                    }]
+                }
+            })
+
+        last_key = scan.get('LastEvaluatedKey')
+        if not last_key:
+            break
+        scan_kwargs['ExclusiveStartKey'] = last_key
+
+    if not requests:
+        return ''
+
+    batch = anthropic_client.messages.batches.create(requests=requests)
+    print(f"Submitted summary batch {batch.id} with {len(requests)} sessions")
+    return batch.id
+
+def store_batch_results(batch_id: str) -> int:
+    """Write finished batch summaries back onto their session items.
+
+    Returns 0 without touching anything if the batch hasn't finished
+    processing yet - collect again later.
+    """
+    batch = anthropic_client.messages.batches.retrieve(batch_id)
+    if batch.processing_status != 'ended':
+        print(f"Batch {batch_id} not finished yet ({batch.processing_status})")
+        return 0
+
+    stored = 0
+
+    for result in anthropic_client.messages.batches.results(batch_id):
+        if result.result.type != 'succeeded':
+            print(f"Summary for {result.custom_id} failed: {result.result.type}")
+            continue
+
+        summary = ''.join(
+            block.text for block in result.result.message.content
+            if block.type == 'text'
+        )
+        conversations_table.update_item(
+            Key={'session_id': result.custom_id},
+            UpdateExpression='SET summary = :summary',
+            ExpressionAttributeValues={':summary': summary}
+        )
+        stored += 1
+
+    print(f"Stored {stored} session summaries from batch {batch_id}")
+    return stored
+
+def lambda_handler(event, context):
+    """Entry point for scheduled or manual summarization runs"""
+    action = event.get('action', 'submit')
+
+    if action == 'submit':
+        return {'batch_id': submit_summary_batch()}
+
+    if action == 'collect':
+        return {'stored': store_batch_results(event['batch_id'])}
+
+    return {'error': f'Unknown action: {action}'}
@@ -1,69 +1,207 @@
+import asyncio
 import json
 import os
+import time
 import boto3
-from anthropic import Anthropic
+import httpx
+import orjson
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from anthropic import AsyncAnthropic
 
-# Initialize clients
-lambda_client = boto3.client('lambda')
-dynamodb = boto3.resource('dynamodb')
-anthropic_client = Anthropic(api_key=os.environ['ANTHROPIC_API_KEY'])
+# Initialize clients - TCP keepalive holds connections open across warm
+# invocations instead of re-handshaking
+_boto_config = Config(tcp_keepalive=True)
+lambda_client = boto3.client('lambda', config=_boto_config)
+dynamodb = boto3.resource('dynamodb', config=_boto_config)
+
+# Shared HTTP/2 client for the Anthropic API - keep-alive amortizes the
+# TLS handshake across calls and HTTP/2 compresses repeated headers
+_anthropic_http = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60)
+)
+anthropic_client = AsyncAnthropic(
+    api_key=os.environ['ANTHROPIC_API_KEY'],
+    http_client=_anthropic_http
+)
+
+# Persistent event loop - asyncio.run would tear the loop down after each
+# invocation, killing the kept-alive connections with it
+_event_loop = asyncio.new_event_loop()
+
+# In-process copy of the MCP tool module, bundled by build.sh. When
+# present, tools run as plain function calls - no inter-Lambda invoke.
+# The MCP Lambda stays deployed as a facade for other callers.
+try:
+    import spa_tools
+except ImportError:
+    spa_tools = None
 
 MCP_LAMBDA_NAME = os.environ['MCP_LAMBDA_NAME']
 CONVERSATIONS_TABLE = os.environ.get('CONVERSATIONS_TABLE', 'spa-conversations')
+TOOLS_CACHE_TTL_SECONDS = int(os.environ.get('TOOLS_CACHE_TTL_SECONDS', '300'))
+SESSION_TTL_SECONDS = int(os.environ.get('SESSION_TTL_SECONDS', '86400'))
+
+# Table handle is cached at module scope - constructing it per request
+# re-walks the boto3 resource model for nothing
+conversations_table = dynamodb.Table(CONVERSATIONS_TABLE)
+
+# In-process session window - warm containers serving the same session
+# (chat reconnects, sticky routing) skip the DynamoDB read entirely
+SESSION_CACHE_TTL_SECONDS = int(os.environ.get('SESSION_CACHE_TTL_SECONDS', '600'))
+SESSION_CACHE_MAX_ENTRIES = 1024
+_session_cache = {}  # session_id -> (messages, expires_at)
+
+# Batch-computed session summaries (see batch_summarizer.py), captured
+# alongside the history read; how many recent messages to keep verbatim
+# when a summary stands in for the older history
+_session_summaries = {}  # session_id -> summary text
+SUMMARY_KEEP_RECENT = 6
+
+# Token budget for the replayed history - prefill cost and latency are
+# O(input tokens), so bound by tokens rather than message count
+HISTORY_TOKEN_BUDGET = int(os.environ.get('HISTORY_TOKEN_BUDGET', '2000'))
+
+SUMMARY_PROMPT = (
+    "Summarize this spa customer conversation in 2-3 sentences. "
+    "Keep the customer's name if given, which services they asked about, "
+    "and any preferences or follow-ups they mentioned."
+)
+
+def _session_cache_put(session_id: str, messages: list):
+    """Store a session's history in the in-process cache"""
+    if session_id not in _session_cache and len(_session_cache) >= SESSION_CACHE_MAX_ENTRIES:
+        # Evict the oldest entry (dicts preserve insertion order)
+        _session_cache.pop(next(iter(_session_cache)))
+    _session_cache[session_id] = (messages, time.time() + SESSION_CACHE_TTL_SECONDS)
+
+# Background executor for write-behind persistence - the user shouldn't
+# wait on the DynamoDB write once the Claude response is computed
+_save_executor = ThreadPoolExecutor(max_workers=2)
+_pending_saves = []
+
+# Tool list cache - the MCP tool list is static between deploys, so warm
+# containers can skip the inter-Lambda round-trip to fetch it
+_tools_cache = (None, 0)  # (claude_tools, expires_at)
 
 def get_conversation_history(session_id: str) -> list:
-    """Get conversation history from DynamoDB"""
+    """Get conversation history, preferring the in-process cache"""
+    cached = _session_cache.get(session_id)
+    if cached and time.time() < cached[1]:
+        return cached[0]
+
     try:
-        table = dynamodb.Table(CONVERSATIONS_TABLE)
-        response = table.get_item(Key={'session_id': session_id})
-        return response.get('Item', {}).get('messages', [])
+        response = conversations_table.get_item(Key={'session_id': session_id})
+        item = response.get('Item', {})
+        messages = item.get('messages', [])
+        if item.get('summary'):
+            _session_summaries[session_id] = item['summary']
+        _session_cache_put(session_id, messages)
+        return messages
     except:
         return []
 
-def save_conversation_history(session_id: str, messages: list):
-    """Save conversation history to DynamoDB"""
+def _persist_conversation(session_id: str, new_messages: list):
+    """Append new messages to the conversation history in DynamoDB
+
+    Uses list_append so each turn only writes the delta instead of
+    rewriting the whole history. The expires_at attribute lets DynamoDB
+    TTL purge stale sessions automatically.
+    """
     try:
-        table = dynamodb.Table(CONVERSATIONS_TABLE)
-        table.put_item(Item={
-            'session_id': session_id,
-            'messages': messages
-        })
+        conversations_table.update_item(
+            Key={'session_id': session_id},
+            UpdateExpression=(
+                "SET messages = list_append(if_not_exists(messages, :empty), :new), "
+                "expires_at = :expires"
+            ),
+            ExpressionAttributeValues={
+                ':new': new_messages,
+                ':empty': [],
+                ':expires': int(time.time()) + SESSION_TTL_SECONDS
+            }
+        )
     except Exception as e:
         print(f"Error saving conversation: {e}")
 
+def save_conversation_history(session_id: str, new_messages: list):
+    """Update the session cache and persist to DynamoDB in the background"""
+    # Keep the in-process copy current so the next turn in this
+    # container doesn't need the DynamoDB read
+    cached = _session_cache.get(session_id)
+    base = cached[0] if cached else []
+    _session_cache_put(session_id, base + new_messages)
+
+    _pending_saves.append(
+        _save_executor.submit(_persist_conversation, session_id, new_messages)
+    )
+
+def flush_pending_saves(timeout: float = 1.0):
+    """Give in-flight history writes a window to land before the handler
+    returns - Lambda freezes background threads between invocations"""
+    while _pending_saves:
+        future = _pending_saves.pop()
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            print(f"Error flushing conversation save: {e}")
+
 def call_mcp_tool(tool_name: str, arguments: dict = None) -> str:
-    """Call the MCP Lambda function"""
+    """Execute an MCP tool, in-process when the module is bundled"""
+    if spa_tools is not None:
+        # Mirror the MCP handler's error contract: a bad tool name or a
+        # failing tool comes back as an error string for Claude to work
+        # around, instead of an exception failing the whole chat turn
+        if tool_name not in spa_tools.TOOLS:
+            return f'Unknown tool: {tool_name}'
+        try:
+            return spa_tools.TOOLS[tool_name]['function'](**(arguments or {}))
+        except Exception as e:
+            print(f"Error executing tool {tool_name}: {e}")
+            return f'Error executing {tool_name}: {e}'
+
     payload = {
-        'body': json.dumps({
+        'body': orjson.dumps({
             'tool_name': tool_name,
             'arguments': arguments or {}
-        })
+        }).decode()
     }
-    
+
     response = lambda_client.invoke(
         FunctionName=MCP_LAMBDA_NAME,
         InvocationType='RequestResponse',
-        Payload=json.dumps(payload)
+        Payload=orjson.dumps(payload)
     )
-    
-    result = json.loads(response['Payload'].read())
-    body = json.loads(result.get('body', '{}'))
+
+    result = orjson.loads(response['Payload'].read())
+    body = orjson.loads(result.get('body', '{}'))
     return body.get('result', '')
 
 def get_available_tools() -> list:
-    """Get list of available tools from MCP Lambda"""
+    """Get list of available tools, in-process when the module is bundled"""
+    if spa_tools is not None:
+        return [
+            {
+                'name': name,
+                'description': info['description'],
+                'parameters': info['parameters']
+            }
+            for name, info in spa_tools.TOOLS.items()
+        ]
+
     payload = {
-        'body': json.dumps({'tool_name': 'list_tools'})
+        'body': orjson.dumps({'tool_name': 'list_tools'}).decode()
     }
-    
+
     response = lambda_client.invoke(
         FunctionName=MCP_LAMBDA_NAME,
         InvocationType='RequestResponse',
-        Payload=json.dumps(payload)
+        Payload=orjson.dumps(payload)
     )
-    
-    result = json.loads(response['Payload'].read())
-    body = json.loads(result.get('body', '{}'))
+
+    result = orjson.loads(response['Payload'].read())
+    body = orjson.loads(result.get('body', '{}'))
     return body.get('tools', [])
 
 def format_tools_for_claude(tools: list) -> list:
@@ -73,15 +211,13 @@ def format_tools_for_claude(tools: list) -> list:
     for tool in tools:
         properties = {}
         required = []
-        
-        for param_name, param_desc in tool.get('parameters', {}).items():
-            param_type = 'string'
-            if 'number' in param_desc.lower():
-                param_type = 'number'
-            
+
+        # Parameter types come straight from the MCP registry - no
+        # inference needed
+        for param_name, param_spec in tool.get('parameters', {}).items():
             properties[param_name] = {
-                'type': param_type,
-                'description': param_desc
+                'type': param_spec['type'],
+                'description': param_spec['description']
             }
             required.append(param_name)
         
@@ -94,21 +230,140 @@ def format_tools_for_claude(tools: list) -> list:
                 'required': required
             }
         })
-    
+
+    # Mark the end of the tool list as a cache breakpoint so Anthropic
+    # caches the whole tools prefix across calls
+    if claude_tools:
+        claude_tools[-1]['cache_control'] = {'type': 'ephemeral'}
+
     return claude_tools
 
-def chat_with_claude(user_message: str, session_id: str) -> dict:
+def estimate_tokens(messages: list) -> int:
+    """Rough token estimate (~4 characters per token)
+
+    A single tool_result can be thousands of tokens, so message count is a
+    poor proxy for prompt size. This doesn't need to be exact - it only
+    decides when the history is worth compressing.
+    """
+    return sum(len(str(m.get('content', ''))) for m in messages) // 4
+
+def _history_text(messages: list) -> str:
+    """Flatten history into plain text for summarization"""
+    lines = []
+    for message in messages:
+        content = message.get('content')
+        if isinstance(content, str):
+            lines.append(f"{message['role']}: {content}")
+        elif isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict) and block.get('type') == 'text':
+                    lines.append(f"{message['role']}: {block['text']}")
+    return '\n'.join(lines)
+
+async def bound_history(session_id: str, history: list) -> list:
+    """Keep the replayed history within the token budget
+
+    Applies any existing summary first; if the result still exceeds the
+    budget, summarizes the older messages with a cheap Haiku call and
+    persists the summary so later turns (and other containers) don't redo
+    the work.
+    """
+    context = compress_history(history, _session_summaries.get(session_id))
+    if estimate_tokens(context) <= HISTORY_TOKEN_BUDGET:
+        return context
+
+    # Summarize exactly what compress_history will drop - everything
+    # older than the verbatim window - so no messages fall between the
+    # summary and the kept tail uncovered
+    older = history[:-SUMMARY_KEEP_RECENT]
+    if not older:
+        # The whole history fits in the verbatim window; summarizing
+        # can't shrink it further
+        return context
+
+    try:
+        response = await anthropic_client.messages.create(
+            model="claude-3-5-haiku-20241022",
+            max_tokens=200,
+            system=SUMMARY_PROMPT,
+            messages=[{'role': 'user', 'content': _history_text(older)}]
+        )
+        summary = ''.join(b.text for b in response.content if b.type == 'text')
+    except Exception as e:
+        print(f"History summarization failed: {e}")
+        return context
+
+    _session_summaries[session_id] = summary
+    # Tracked in _pending_saves so flush_pending_saves waits for it -
+    # an untracked future can be frozen mid-write when the handler
+    # returns, and the summary would never land
+    _pending_saves.append(
+        _save_executor.submit(_persist_summary, session_id, summary)
+    )
+    return compress_history(history, summary)
+
+def _persist_summary(session_id: str, summary: str):
+    """Store a session summary so it survives this container"""
+    try:
+        conversations_table.update_item(
+            Key={'session_id': session_id},
+            UpdateExpression='SET summary = :summary',
+            ExpressionAttributeValues={':summary': summary}
+        )
+    except Exception as e:
+        print(f"Error saving summary: {e}")
+
+def compress_history(history: list, summary: str) -> list:
+    """Replace older history with a batch-computed summary when available
+
+    Keeps the last few messages verbatim and swaps everything older for a
+    single summary message, so long sessions don't bloat every prefill.
+    """
+    if not summary or len(history) <= SUMMARY_KEEP_RECENT:
+        return history
+
+    recent = history[-SUMMARY_KEEP_RECENT:]
+    # Don't open the window on a tool_result with no matching tool_use
+    while recent and recent[0].get('role') == 'user' and isinstance(recent[0].get('content'), list):
+        recent = recent[1:]
+
+    return [{
+        'role': 'user',
+        'content': f"[Summary of the conversation so far: {summary}]"
+    }] + recent
+
+def get_claude_tools() -> list:
+    """Get Claude-formatted tools, cached across invocations with a TTL"""
+    global _tools_cache
+
+    claude_tools, expires_at = _tools_cache
+    if claude_tools is not None and time.time() < expires_at:
+        return claude_tools
+
+    claude_tools = format_tools_for_claude(get_available_tools())
+    _tools_cache = (claude_tools, time.time() + TOOLS_CACHE_TTL_SECONDS)
+    return claude_tools
+
+# Prefetch the tool list during the init phase - init CPU is boosted on
+# Lambda and with provisioned concurrency it runs before any user waits
+try:
+    get_claude_tools()
+except Exception as e:
+    print(f"Tool prefetch skipped: {e}")
+
+async def chat_with_claude(user_message: str, session_id: str) -> dict:
     """Main chat function with Claude"""
     
     # Get conversation history
     history = get_conversation_history(session_id)
     
-    # Get available tools
-    tools = get_available_tools()
-    claude_tools = format_tools_for_claude(tools)
-    
-    # Build messages for Claude
-    messages = history + [{'role': 'user', 'content': user_message}]
+    # Get available tools (cached across warm invocations)
+    claude_tools = get_claude_tools()
+
+    # Build messages for Claude - history is bounded by token budget,
+    # with older turns compressed into a summary when it overflows
+    context = await bound_history(session_id, history)
+    messages = context + [{'role': 'user', 'content': user_message}]
     
     # System prompt
     system_prompt = """You are a friendly spa receptionist at "Serenity Spa".
@@ -121,19 +376,35 @@ Your role:
 
 Use the tools available to get accurate service information.
 Keep responses conversational and concise."""
-    
+
+    # Send the system prompt as a cacheable block - it's identical on every
+    # call, so Anthropic serves it from cache on follow-up turns
+    system_blocks = [{
+        'type': 'text',
+        'text': system_prompt,
+        'cache_control': {'type': 'ephemeral'}
+    }]
+
     # Call Claude
-    response = anthropic_client.messages.create(
+    response = await anthropic_client.messages.create(
         model="claude-3-5-haiku-20241022",
         max_tokens=1024,
-        system=system_prompt,
+        system=system_blocks,
         messages=messages,
         tools=claude_tools if claude_tools else None
     )
+    print(f"Cache read tokens: {response.usage.cache_read_input_tokens}")
     
     # Process response with tool use loop
     final_text = ""
 
+    # Memoize tool results for the duration of this turn - Claude can
+    # request the same tool with identical arguments more than once
+    tool_cache = {}
+
+    def _tool_key(block):
+        return (block.name, json.dumps(block.input, sort_keys=True))
+
     while True:
         # Process current response
         assistant_content = []
@@ -150,37 +421,50 @@ Keep responses conversational and concise."""
         # Add assistant message
         messages.append({'role': 'assistant', 'content': assistant_content})
 
-        # If tools were used, execute them and continue
+        # If tools were used, execute them all in parallel and continue
         if needs_tool_result:
-            tool_results = []
-            for content_block in response.content:
-                if content_block.type == 'tool_use':
-                    tool_result = call_mcp_tool(content_block.name, content_block.input)
-                    tool_results.append({
-                        'type': 'tool_result',
-                        'tool_use_id': content_block.id,
-                        'content': tool_result
-                    })
+            tool_blocks = [b for b in response.content if b.type == 'tool_use']
+
+            # Only invoke the MCP Lambda for calls we haven't seen this
+            # turn; concurrent duplicates collapse into one invocation
+            pending = {}
+            for block in tool_blocks:
+                key = _tool_key(block)
+                if key not in tool_cache and key not in pending:
+                    pending[key] = asyncio.to_thread(call_mcp_tool, block.name, block.input)
+
+            if pending:
+                for key, tool_result in zip(pending, await asyncio.gather(*pending.values())):
+                    tool_cache[key] = tool_result
+
+            tool_results = [
+                {
+                    'type': 'tool_result',
+                    'tool_use_id': block.id,
+                    'content': tool_cache[_tool_key(block)]
+                }
+                for block in tool_blocks
+            ]
 
             # Add tool results message
             messages.append({'role': 'user', 'content': tool_results})
 
             # Get next response from Claude
-            response = anthropic_client.messages.create(
+            response = await anthropic_client.messages.create(
                 model="claude-3-5-haiku-20241022",
                 max_tokens=1024,
-                system=system_prompt,
+                system=system_blocks,
                 messages=messages,
                 tools=claude_tools if claude_tools else None
             )
+            print(f"Cache read tokens: {response.usage.cache_read_input_tokens}")
         else:
             # No more tools needed, exit loop
             break
 
-    # Save conversation history (everything after the original history)
-    new_messages = messages[len(history):]
-    updated_history = history + new_messages
-    save_conversation_history(session_id, updated_history[-20:])  # Keep last 20 messages
+    # Persist only this turn's new messages - DynamoDB appends the delta
+    new_messages = messages[len(context):]
+    save_conversation_history(session_id, new_messages)
     
     return {
         'message': final_text,
@@ -219,8 +503,13 @@ def lambda_handler(event, context):
             }
         
         # Get response
-        result = chat_with_claude(user_message, session_id)
-        
+        result = _event_loop.run_until_complete(chat_with_claude(user_message, session_id))
+
+        # The history write was started in the background - let it finish
+        # (briefly) so it isn't lost when the container freezes
+        flush_pending_saves()
+
+
         return {
             'statusCode': 200,
             'headers': {
@@ -1,20 +1,78 @@
-import json
 import os
+import time
 import boto3
+import orjson
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from typing import List, Dict
 
-s3_client = boto3.client('s3')
+# TCP keepalive keeps the S3 connection alive across warm invocations
+s3_client = boto3.client('s3', config=Config(tcp_keepalive=True))
 BUCKET_NAME = os.environ.get('BUCKET_NAME', 'your-spa-bucket')
+SERVICES_CACHE_TTL_SECONDS = 60
+
+# Services cache - warm containers reuse the parsed list instead of
+# re-fetching services.json from S3 on every tool call
+_services_cache = {'etag': None, 'data': None, 'index': None, 'expires': 0}
+
+def _build_service_index(services: List[dict]) -> dict:
+    """Precompute lookup structures so tool handlers don't re-scan the list
+
+    Built once per cache refresh: lowercased names for matching, a parallel
+    price list for filtering, and category buckets for get_service_categories.
+    """
+    names_lower = [s['name'].lower() for s in services]
+    return {
+        'names_lower': names_lower,
+        'prices': [s['price'] for s in services],
+        'nails': [s for s, n in zip(services, names_lower)
+                  if 'nail' in n or n in ('manicure', 'pedicure')],
+        'hair': [s for s, n in zip(services, names_lower)
+                 if 'hair' in n or 'blowout' in n],
+        'spa': [s for s, n in zip(services, names_lower)
+                if n in ('facial', 'massage')]
+    }
 
 def load_services() -> List[dict]:
-    """Load services from S3"""
+    """Load services from S3, cached across invocations"""
+    now = time.time()
+
+    # Fresh enough - skip S3 entirely
+    if _services_cache['data'] is not None and now < _services_cache['expires']:
+        return _services_cache['data']
+
     try:
-        response = s3_client.get_object(Bucket=BUCKET_NAME, Key='services.json')
-        data = json.loads(response['Body'].read())
-        return data['services']
+        kwargs = {'Bucket': BUCKET_NAME, 'Key': 'services.json'}
+        if _services_cache['etag']:
+            # Conditional GET - S3 returns 304 without the payload if
+            # services.json hasn't changed since we cached it
+            kwargs['IfNoneMatch'] = _services_cache['etag']
+
+        try:
+            response = s3_client.get_object(**kwargs)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == '304':
+                _services_cache['expires'] = now + SERVICES_CACHE_TTL_SECONDS
+                return _services_cache['data']
+            raise
+
+        data = orjson.loads(response['Body'].read())
+        _services_cache['etag'] = response.get('ETag')
+        _services_cache['data'] = data['services']
+        _services_cache['index'] = _build_service_index(data['services'])
+        _services_cache['expires'] = now + SERVICES_CACHE_TTL_SECONDS
+        return _services_cache['data']
     except Exception as e:
         print(f"Error loading services: {e}")
-        return []
+        # Fall back to stale data rather than failing the tool call
+        return _services_cache['data'] or []
+
+def load_service_index() -> dict:
+    """Load services and return the precomputed index"""
+    services = load_services()
+    if _services_cache['index'] is None:
+        _services_cache['index'] = _build_service_index(services)
+    return _services_cache['index']
 
 def get_all_services() -> str:
     """Get the complete list of spa services"""
@@ -33,16 +91,18 @@ def get_all_services() -> str:
 def get_service_info(service_name: str) -> str:
     """Get details about a specific service"""
     services = load_services()
-    
+    names_lower = load_service_index()['names_lower']
+    query = service_name.lower()
+
     # Exact match
-    for service in services:
-        if service['name'].lower() == service_name.lower():
+    for service, name in zip(services, names_lower):
+        if name == query:
             return (f"{service['name']}\n"
                    f"Price: ${service['price']}\n"
                    f"Duration: {service['duration']}")
-    
+
     # Partial match
-    matches = [s for s in services if service_name.lower() in s['name'].lower()]
+    matches = [s for s, n in zip(services, names_lower) if query in n]
     if matches:
         result = "Did you mean:\n"
         for s in matches:
@@ -54,8 +114,9 @@ def get_service_info(service_name: str) -> str:
 def search_by_price(max_price: float) -> str:
     """Find services under a specific price"""
     services = load_services()
-    
-    affordable = [s for s in services if s['price'] <= max_price]
+    prices = load_service_index()['prices']
+
+    affordable = [s for s, p in zip(services, prices) if p <= max_price]
     
     if not affordable:
         return f"Sorry, we don't have services under ${max_price}."
@@ -68,12 +129,11 @@ def search_by_price(max_price: float) -> str:
 
 def get_service_categories() -> str:
     """Get services organized by type"""
-    services = load_services()
-    
-    # Simple categorization
-    nails = [s for s in services if 'nail' in s['name'].lower() or s['name'].lower() in ['manicure', 'pedicure']]
-    hair = [s for s in services if 'hair' in s['name'].lower() or 'blowout' in s['name'].lower()]
-    spa = [s for s in services if s['name'].lower() in ['facial', 'massage']]
+    # Category buckets are precomputed once per cache refresh
+    index = load_service_index()
+    nails = index['nails']
+    hair = index['hair']
+    spa = index['spa']
     
     result = "📋 SERVICES BY CATEGORY\n\n"
     
@@ -107,14 +167,14 @@ TOOLS = {
         'function': get_service_info,
         'description': 'Get details about a specific service',
         'parameters': {
-            'service_name': 'string - Name of the service'
+            'service_name': {'type': 'string', 'description': 'Name of the service'}
         }
     },
     'search_by_price': {
         'function': search_by_price,
         'description': 'Find services under a specific price',
         'parameters': {
-            'max_price': 'number - Maximum price'
+            'max_price': {'type': 'number', 'description': 'Maximum price'}
         }
     },
     'get_service_categories': {
@@ -125,50 +185,73 @@ TOOLS = {
 }
 
 def lambda_handler(event, context):
-    """Handle MCP tool calls"""
-    
-    # Parse request
-    body = json.loads(event.get('body', '{}'))
+    """Handle MCP tool calls
+
+    Two request shapes are accepted:
+    - API Gateway: the tool request arrives JSON-encoded in event['body']
+      and the response is the usual statusCode envelope with a stringified
+      JSON body
+    - Direct Lambda-to-Lambda: the tool request sits at the top level of
+      the event and the result dict is returned as-is - the envelope (and
+      its extra serialize/parse on both ends) is pure overhead for callers
+      that never go through API Gateway
+    """
+
+    # Parse request - direct callers skip the stringified body
+    direct = 'tool_name' in event and 'body' not in event
+    body = event if direct else orjson.loads(event.get('body', '{}'))
     tool_name = body.get('tool_name')
     arguments = body.get('arguments', {})
     
     # List available tools
     if tool_name == 'list_tools':
+        payload = {
+            'tools': [
+                {
+                    'name': name,
+                    'description': info['description'],
+                    'parameters': info['parameters']
+                }
+                for name, info in TOOLS.items()
+            ]
+        }
+        if direct:
+            return payload
         return {
             'statusCode': 200,
-            'body': json.dumps({
-                'tools': [
-                    {
-                        'name': name,
-                        'description': info['description'],
-                        'parameters': info['parameters']
-                    }
-                    for name, info in TOOLS.items()
-                ]
-            })
+            'body': orjson.dumps(payload).decode()
         }
     
     # Execute tool
     if tool_name not in TOOLS:
+        payload = {'error': f'Unknown tool: {tool_name}'}
+        if direct:
+            return payload
         return {
             'statusCode': 400,
-            'body': json.dumps({'error': f'Unknown tool: {tool_name}'})
+            'body': orjson.dumps(payload).decode()
         }
     
     try:
         tool_func = TOOLS[tool_name]['function']
         result = tool_func(**arguments)
         
+        payload = {'result': result}
+        if direct:
+            return payload
         return {
             'statusCode': 200,
             'headers': {
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
-            'body': json.dumps({'result': result})
+            'body': orjson.dumps(payload).decode()
         }
     except Exception as e:
+        payload = {'error': str(e)}
+        if direct:
+            return payload
         return {
             'statusCode': 500,
-            'body': json.dumps({'error': str(e)})
+            'body': orjson.dumps(payload).decode()
         }
\ No newline at end of file
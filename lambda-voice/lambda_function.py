@@ -14,27 +14,26 @@ Flow:
 6. Lambda sends response back as TwiML for Twilio to speak
 """
 
-import json  # For parsing and creating JSON data
+import orjson  # C-backed JSON - parses/serializes several times faster than stdlib
+import logging  # For level-gated logging (cheaper than unconditional print)
 import os  # For reading environment variables (API keys, etc.)
+import re  # For finding sentence boundaries in Claude's responses
+import time  # For monotonic timestamps on cached conversation state
+import uuid  # For generating tool_use ids on prefetched tool results
+from collections import OrderedDict  # LRU ordering for the session cache
 import boto3  # AWS SDK - used to interact with other AWS services
-from anthropic import Anthropic  # Claude AI SDK for natural language processing
-from urllib.parse import parse_qs  # For parsing form data from Twilio
+from botocore.config import Config  # Tuning for the AWS SDK's HTTP layer
+from urllib.parse import parse_qsl  # For parsing form data from Twilio
 import base64  # For decoding base64-encoded request bodies from API Gateway
+from concurrent.futures import ThreadPoolExecutor  # For overlapping independent network calls
+from xml.sax.saxutils import escape  # For XML-escaping text spoken via TwiML
 
-# ============================================================================
-# INITIALIZE AWS AND API CLIENTS
-# ============================================================================
-# These clients allow us to talk to other services
-
-# Lambda client - allows this function to invoke the MCP Lambda function
-lambda_client = boto3.client('lambda')
-
-# DynamoDB resource - allows us to save/load conversation history from database
-dynamodb = boto3.resource('dynamodb')
-
-# Anthropic client - allows us to send messages to Claude AI
-# The API key is stored as an environment variable for security
-anthropic_client = Anthropic(api_key=os.environ['ANTHROPIC_API_KEY'])
+# Logger with a level gate - lazy %-style arguments mean expensive
+# serialization (like dumping the whole API Gateway event) only happens
+# when the level is actually enabled. CloudWatch bills per byte logged,
+# so DEBUG-only detail stays out of production log volume.
+logger = logging.getLogger()
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
 # ============================================================================
 # CONFIGURATION FROM ENVIRONMENT VARIABLES
@@ -48,10 +47,195 @@ MCP_LAMBDA_NAME = os.environ['MCP_LAMBDA_NAME']
 # Defaults to 'spa-conversations' if not set
 CONVERSATIONS_TABLE = os.environ.get('CONVERSATIONS_TABLE', 'spa-conversations')
 
+# ============================================================================
+# AWS AND API CLIENTS (BUILT LAZILY)
+# ============================================================================
+# Clients are constructed on first use, not at import time. The
+# /voice/incoming and /voice/gather routes only build TwiML - they never
+# touch Claude or DynamoDB - so a cold start serving them shouldn't pay
+# for client setup (credential chain, endpoint resolution, TLS pools) or
+# the Anthropic SDK import. Each accessor builds its client exactly once
+# per container; every later call is a cheap None check.
+
+# Shared HTTP settings for the AWS SDK clients:
+# - a larger connection pool plus TCP keepalive so warm-but-idle
+#   containers reuse connections instead of paying TLS handshakes
+# - tight connect/read timeouts and capped retries so a slow AWS call
+#   can't eat the whole Twilio webhook window
+_boto_config = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 2, 'mode': 'standard'},
+    connect_timeout=1,
+    read_timeout=4,
+    tcp_keepalive=True
+)
+
+_lambda_client = None
+_ddb_client = None
+_conversations_table = None
+_anthropic_client = None
+
+def _get_lambda_client():
+    """Lambda client for invoking the MCP tools function"""
+    global _lambda_client
+    if _lambda_client is None:
+        _lambda_client = boto3.client('lambda', config=_boto_config)
+    return _lambda_client
+
+def _get_ddb_client():
+    """
+    Low-level DynamoDB client for the history hot path.
+
+    The resource API runs its TypeSerializer/TypeDeserializer over every
+    nested message dict on each call, which is hundreds of allocations
+    per turn for a Claude history. The client API with a single JSON
+    string attribute skips that entire marshalling layer.
+    """
+    global _ddb_client
+    if _ddb_client is None:
+        _ddb_client = boto3.client('dynamodb', config=_boto_config)
+    return _ddb_client
+
+def _get_conversations_table():
+    """DynamoDB Table resource handle, used for pending_speech updates"""
+    global _conversations_table
+    if _conversations_table is None:
+        _conversations_table = boto3.resource(
+            'dynamodb', config=_boto_config
+        ).Table(CONVERSATIONS_TABLE)
+    return _conversations_table
+
+def _get_anthropic():
+    """
+    Anthropic client over a shared HTTP/2 keep-alive pool.
+
+    The SDK import lives in here too - it's one of the heaviest imports
+    in the package and the TwiML-only routes never need it. Keep-alive
+    means warm containers skip the TLS handshake on every Claude call -
+    worth 50-150ms on the phone path.
+    """
+    global _anthropic_client
+    if _anthropic_client is None:
+        import httpx
+        from anthropic import Anthropic
+
+        _anthropic_client = Anthropic(
+            api_key=os.environ['ANTHROPIC_API_KEY'],
+            # Fail fast: 1s to connect, 4s per request attempt, one retry.
+            # Without a ceiling a slow Claude call blocks the webhook
+            # until Lambda's own timeout - long after Twilio has given up
+            # and retried, leaving the caller with dead air and a double
+            # response. A hard cap keeps the worst case inside Twilio's
+            # patience window. (For streaming, the 4s applies per read
+            # gap, not to total generation time.)
+            timeout=httpx.Timeout(4.0, connect=1.0),
+            max_retries=1,
+            http_client=httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60)
+            )
+        )
+    return _anthropic_client
+
+# Provisioned-concurrency instances run init ahead of any caller, so
+# eager warming there is free: build every client and open the DynamoDB
+# TLS session before the first webhook. On-demand cold starts skip this
+# and let the first route that needs a client pay for exactly what it
+# uses - /voice/incoming then returns TwiML without touching any of it.
+if os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') == 'provisioned-concurrency':
+    try:
+        _get_ddb_client().describe_table(TableName=CONVERSATIONS_TABLE)
+        _get_lambda_client()
+        _get_anthropic()
+    except Exception as e:
+        logger.warning("Client prewarm skipped: %s", e)
+
+# Small thread pool so independent network fetches (DynamoDB history,
+# MCP tool list, speculative tool prefetch) can run at the same time
+# instead of back-to-back - all are I/O-bound, so the GIL is released
+# while they wait
+_fetch_executor = ThreadPoolExecutor(max_workers=3)
+
+# Write-behind history saves. The save at the end of a turn sat serially
+# on the caller's critical path - Twilio was waiting on the TwiML while
+# we waited on the database. Instead the save is submitted here and the
+# handler flushes it right before returning, so the write overlaps TwiML
+# generation and the pending-speech stash. The flush matters: Lambda
+# freezes the execution environment the moment the handler returns, and
+# a write still on a background thread at that point may never land.
+_save_executor = ThreadPoolExecutor(max_workers=2)
+_pending_saves = []
+
+def flush_pending_saves(timeout: float = 1.0):
+    """Wait for in-flight history saves before the handler returns"""
+    global _pending_saves
+    pending, _pending_saves = _pending_saves, []
+    for future in pending:
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            # The save function logs its own errors; this catches timeouts
+            logger.error("Background save did not complete: %s", e)
+
 # ============================================================================
 # DATABASE FUNCTIONS - Conversation History
 # ============================================================================
 
+# Once a call grows past this many stored messages, the older turns are
+# collapsed into a one-line summary before being replayed to Claude
+SUMMARY_TRIGGER_MESSAGES = 6
+
+# How many recent user/assistant exchanges stay verbatim in the prompt
+SUMMARY_KEEP_PAIRS = 4
+
+# In-process cache of call summaries (call_sid -> one-line summary).
+# The summary is generated once per call, then reused on every later
+# turn; it also rides along in DynamoDB so a different container can
+# pick it up mid-call.
+_session_summaries = {}
+
+# In-process cache of conversation history (session_id -> (messages,
+# monotonic_ts)). Twilio webhooks for one call usually land on the same
+# warm container, so after the first turn the authoritative copy is
+# already in memory and the DynamoDB read hop can be skipped. Writes
+# still go through to DynamoDB (see save_conversation_history) so a
+# different container can recover mid-call. Bounded LRU + TTL so a
+# long-lived container doesn't accumulate stale calls.
+SESSION_CACHE_MAX_ENTRIES = 64
+SESSION_CACHE_TTL_SECONDS = 300
+_session_cache = OrderedDict()
+
+# Optional Redis session store - set REDIS_URL (e.g. an ElastiCache
+# endpoint reachable from the Lambda's VPC) and history reads/writes
+# move to Redis: sub-millisecond round-trips versus 10-30ms for DynamoDB,
+# with the session's 15-minute lifetime enforced natively via SETEX.
+# Unset (the default), everything behaves exactly as before; on any
+# Redis error the code falls back to DynamoDB for that operation.
+# Timeouts are aggressive - a sick Redis must not stall the webhook.
+REDIS_URL = os.environ.get('REDIS_URL')
+REDIS_SESSION_TTL_SECONDS = 900
+_redis = None
+
+def _get_redis():
+    """Redis client when REDIS_URL is configured, else None"""
+    global _redis
+    if _redis is None and REDIS_URL:
+        import redis
+        _redis = redis.Redis.from_url(
+            REDIS_URL,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+            retry_on_timeout=False
+        )
+    return _redis
+
+def _session_cache_put(session_id: str, messages: list):
+    """Insert/refresh a cache entry, evicting the least recently used"""
+    _session_cache[session_id] = (messages, time.monotonic())
+    _session_cache.move_to_end(session_id)
+    while len(_session_cache) > SESSION_CACHE_MAX_ENTRIES:
+        _session_cache.popitem(last=False)
+
 def get_conversation_history(session_id: str) -> list:
     """
     Retrieve previous messages from this phone conversation.
@@ -67,16 +251,68 @@ def get_conversation_history(session_id: str) -> list:
         - Each phone call has a unique CallSid from Twilio
         - We use this as the session_id to look up past messages
         - This allows Claude to remember context from earlier in the call
+        - Messages are stored as one JSON string ('msgs') so reading them
+          is a single orjson.loads instead of deserializing nested DynamoDB
+          types item by item
+        - On turn 2+ of a call handled by the same warm container, the
+          history comes straight from the in-process cache - no DynamoDB
+          round-trip at all
     """
-    try:
-        # Connect to the conversations table in DynamoDB
-        table = dynamodb.Table(CONVERSATIONS_TABLE)
+    # Serve from the in-process cache when this container saved the
+    # conversation recently - it wrote that copy itself, so it's current
+    cached = _session_cache.get(session_id)
+    if cached is not None:
+        messages, cached_at = cached
+        if time.monotonic() - cached_at <= SESSION_CACHE_TTL_SECONDS:
+            _session_cache.move_to_end(session_id)
+            return messages
+        del _session_cache[session_id]
+
+    # Redis, when configured, is the primary session store - a miss there
+    # means a new call, not a reason to go ask DynamoDB too
+    redis_client = _get_redis()
+    if redis_client is not None:
+        try:
+            raw = redis_client.get(f'conv:{session_id}')
+        except Exception as e:
+            logger.warning("Redis read failed, falling back to DynamoDB: %s", e)
+        else:
+            if not raw:
+                return []
+            payload = orjson.loads(raw)
+            # The stored value is {'msgs': [...], 'summary': ...}; a bare
+            # list is tolerated in case older data is lying around
+            if isinstance(payload, dict):
+                if payload.get('summary'):
+                    _session_summaries[session_id] = payload['summary']
+                messages = payload.get('msgs', [])
+            else:
+                messages = payload
+            _session_cache_put(session_id, messages)
+            return messages
 
+    try:
         # Look up this specific conversation by session_id
-        response = table.get_item(Key={'session_id': session_id})
+        response = _get_ddb_client().get_item(
+            TableName=CONVERSATIONS_TABLE,
+            Key={'session_id': {'S': session_id}},
+            ProjectionExpression='msgs, #summary',
+            ExpressionAttributeNames={'#summary': 'summary'}
+        )
+
+        # Parse the stored JSON, return empty list if not found
+        item = response.get('Item')
+        if not item:
+            return []
+
+        # A previously generated call summary rides along in the same read
+        # so compress_history can reuse it on a fresh container
+        if 'summary' in item:
+            _session_summaries[session_id] = item['summary']['S']
 
-        # Extract the messages array, return empty list if not found
-        return response.get('Item', {}).get('messages', [])
+        messages = orjson.loads(item['msgs']['S'])
+        _session_cache_put(session_id, messages)
+        return messages
     except:
         # If anything goes wrong, just start with no history
         return []
@@ -93,19 +329,61 @@ def save_conversation_history(session_id: str, messages: list):
         - Allows Claude to remember what was said earlier in the call
         - Example: User asks "What's the price?" then "How long does it take?"
           Claude needs to remember which service they were asking about
+
+    Write-through: the in-process cache is updated first so the next turn
+    on this container reads from memory, then Redis (when configured) or
+    DynamoDB gets the durable copy in case a different container picks
+    up the call.
     """
+    _session_cache_put(session_id, messages)
+
+    redis_client = _get_redis()
+    if redis_client is not None:
+        try:
+            payload = {'msgs': messages}
+            summary = _session_summaries.get(session_id)
+            if summary:
+                payload['summary'] = summary
+            # SETEX gives the session its 15-minute lifetime natively -
+            # no TTL attribute or sweeper needed
+            redis_client.setex(
+                f'conv:{session_id}',
+                REDIS_SESSION_TTL_SECONDS,
+                orjson.dumps(payload)
+            )
+            return
+        except Exception as e:
+            logger.warning("Redis write failed, falling back to DynamoDB: %s", e)
+
     try:
-        # Connect to the conversations table
-        table = dynamodb.Table(CONVERSATIONS_TABLE)
+        # Save the conversation as one compact JSON string. This must be
+        # update_item, not put_item: the save runs on a background thread
+        # while the handler stashes pending_speech on the same item, and
+        # a whole-item put landing after the stash would erase it - the
+        # caller would then get the fallback prompt instead of the rest
+        # of the answer. update_item only touches the attributes named
+        # here, so the two writes can land in either order.
+        update_expression = 'SET msgs = :msgs'
+        values = {':msgs': {'S': orjson.dumps(messages).decode()}}
+
+        summary = _session_summaries.get(session_id)
+        if summary:
+            update_expression += ', #summary = :summary'
+            values[':summary'] = {'S': summary}
+
+        kwargs = {
+            'TableName': CONVERSATIONS_TABLE,
+            'Key': {'session_id': {'S': session_id}},
+            'UpdateExpression': update_expression,
+            'ExpressionAttributeValues': values
+        }
+        if summary:
+            kwargs['ExpressionAttributeNames'] = {'#summary': 'summary'}
 
-        # Save (or overwrite) the conversation with updated messages
-        table.put_item(Item={
-            'session_id': session_id,
-            'messages': messages
-        })
+        _get_ddb_client().update_item(**kwargs)
     except Exception as e:
         # Log error but don't crash - conversation can continue without history
-        print(f"Error saving conversation: {e}")
+        logger.error("Error saving conversation: %s", e)
 
 # ============================================================================
 # MCP LAMBDA INTEGRATION - Business Logic Tools
@@ -113,6 +391,28 @@ def save_conversation_history(session_id: str, messages: list):
 # These functions communicate with the MCP Lambda, which provides tools for
 # looking up spa services, prices, and availability
 
+def _invoke_mcp(request: dict) -> dict:
+    """
+    Invoke the MCP Lambda and return its parsed response.
+
+    The request is sent unwrapped at the top level - the MCP handler's
+    direct Lambda-to-Lambda mode - so neither side serializes a nested
+    JSON body just for the other to parse it again. One dumps here, one
+    loads of the Payload stream, done. If the response still carries the
+    API Gateway envelope (an older MCP deployment mid-rollout), the body
+    is unwrapped for compatibility.
+    """
+    response = _get_lambda_client().invoke(
+        FunctionName=MCP_LAMBDA_NAME,
+        InvocationType='RequestResponse',
+        Payload=orjson.dumps(request)  # invoke accepts bytes directly
+    )
+
+    result = orjson.loads(response['Payload'].read())
+    if isinstance(result, dict) and 'body' in result:
+        return orjson.loads(result['body'])
+    return result
+
 def call_mcp_tool(tool_name: str, arguments: dict = None) -> str:
     """
     Execute a specific tool by calling the MCP Lambda function.
@@ -134,27 +434,18 @@ def call_mcp_tool(tool_name: str, arguments: dict = None) -> str:
         call_mcp_tool('get_services', {'category': 'Facial'})
         -> Returns JSON string of all facial services
     """
-    # Create the request payload for the MCP Lambda
-    payload = {
-        'body': json.dumps({
-            'tool_name': tool_name,
-            'arguments': arguments or {}
-        })
-    }
-
-    # Invoke the MCP Lambda function and wait for response
-    # 'RequestResponse' means we wait for the result (synchronous call)
-    response = lambda_client.invoke(
-        FunctionName=MCP_LAMBDA_NAME,
-        InvocationType='RequestResponse',
-        Payload=json.dumps(payload)
-    )
-
-    # Parse the response - Lambda returns nested JSON
-    result = json.loads(response['Payload'].read())  # Read the response stream
-    body = json.loads(result.get('body', '{}'))  # Extract the body
+    body = _invoke_mcp({
+        'tool_name': tool_name,
+        'arguments': arguments or {}
+    })
     return body.get('result', '')  # Return the actual result string
 
+# Cached tool definitions - the MCP tool list only changes on deploy,
+# so a warm container fetches it once and skips the inter-Lambda
+# round-trip on every later call
+_tools_cache = None
+_claude_tools_cache = None
+
 def get_available_tools() -> list:
     """
     Get the list of all tools that the MCP Lambda provides.
@@ -170,23 +461,20 @@ def get_available_tools() -> list:
         - Each tool definition tells Claude when and how to use it
         - Example: Claude sees "search_by_price" tool and knows it can
           help when a customer asks "What's under $100?"
+
+    The result is cached at module scope - on a warm container this
+    function only pays the MCP Lambda hop the first time.
     """
-    # Create request to list all available tools
-    payload = {
-        'body': json.dumps({'tool_name': 'list_tools'})
-    }
+    global _tools_cache
 
-    # Call the MCP Lambda
-    response = lambda_client.invoke(
-        FunctionName=MCP_LAMBDA_NAME,
-        InvocationType='RequestResponse',
-        Payload=json.dumps(payload)
-    )
+    # Serve from cache when this container has already fetched the list
+    if _tools_cache is not None:
+        return _tools_cache
 
-    # Parse and return the list of tools
-    result = json.loads(response['Payload'].read())
-    body = json.loads(result.get('body', '{}'))
-    return body.get('tools', [])
+    # Ask the MCP Lambda for its tool list and cache it
+    body = _invoke_mcp({'tool_name': 'list_tools'})
+    _tools_cache = body.get('tools', [])
+    return _tools_cache
 
 def format_tools_for_claude(tools: list) -> list:
     """
@@ -208,7 +496,7 @@ def format_tools_for_claude(tools: list) -> list:
         {
             'name': 'search_by_price',
             'description': 'Find services under a price',
-            'parameters': {'max_price': 'Maximum price (number)'}
+            'parameters': {'max_price': {'type': 'number', 'description': 'Maximum price'}}
         }
 
         Claude format:
@@ -231,17 +519,13 @@ def format_tools_for_claude(tools: list) -> list:
         properties = {}
         required = []
 
-        # Convert each parameter
-        for param_name, param_desc in tool.get('parameters', {}).items():
-            # Try to infer the parameter type from description
-            param_type = 'string'  # Default to string
-            if 'number' in param_desc.lower():
-                param_type = 'number'
-
+        # Convert each parameter - the MCP registry declares explicit
+        # types, so no guessing from descriptions is needed
+        for param_name, param_spec in tool.get('parameters', {}).items():
             # Add to properties dict
             properties[param_name] = {
-                'type': param_type,
-                'description': param_desc
+                'type': param_spec['type'],
+                'description': param_spec['description']
             }
             # All parameters are required
             required.append(param_name)
@@ -257,12 +541,114 @@ def format_tools_for_claude(tools: list) -> list:
             }
         })
 
+    # Mark the last tool as a cache breakpoint so Anthropic caches the
+    # whole tools+system prefix - it's byte-identical on every call
+    if claude_tools:
+        claude_tools[-1]['cache_control'] = {'type': 'ephemeral'}
+
     return claude_tools
 
+def get_claude_tools() -> list:
+    """
+    Get the Claude-formatted tool list, cached at module scope.
+
+    Fetching and reformatting the same static list on every webhook was
+    pure wasted latency on the phone call's critical path - a warm
+    container does the work once and reuses the result.
+    """
+    global _claude_tools_cache
+
+    if _claude_tools_cache is None:
+        _claude_tools_cache = format_tools_for_claude(get_available_tools())
+
+    return _claude_tools_cache
+
+def maybe_prefetch_tool(user_message: str):
+    """
+    Speculatively run the tool an obvious question will need, before Claude asks.
+
+    The normal tool-use loop is a serial chain: Claude call -> tool_use ->
+    MCP Lambda -> second Claude call. For the most common questions
+    ("what facials do you have?", "how much is a massage?") the tool
+    Claude will pick is predictable from keywords alone, so we run it up
+    front and hand Claude the result as an already-completed tool_use/
+    tool_result pair - Claude then answers in a single round-trip.
+
+    Only high-confidence matches prefetch; anything ambiguous returns
+    None and goes through the normal loop. A wrong guess is still safe:
+    Claude just ignores the extra data or requests another tool.
+
+    Returns:
+        (tool_name, arguments, result) on a match, or None
+    """
+    lower = user_message.lower()
+
+    if any(word in lower for word in ('category', 'categories', 'kinds of', 'types of')):
+        tool_name = 'get_service_categories'
+    elif any(word in lower for word in (
+        'service', 'price', 'cost', 'how much', 'offer',
+        'facial', 'massage', 'manicure', 'pedicure',
+    )):
+        # The full catalog covers both "what do you offer" and price
+        # questions - it's small, and Claude picks out what's relevant
+        tool_name = 'get_all_services'
+    else:
+        return None
+
+    try:
+        return tool_name, {}, call_mcp_tool(tool_name, {})
+    except Exception as e:
+        # Prefetch is an optimization, never a requirement - fall back to
+        # the normal loop and let Claude request the tool itself
+        logger.warning("Tool prefetch failed: %s", e)
+        return None
+
 # ============================================================================
 # CLAUDE AI CONVERSATION - Main Intelligence
 # ============================================================================
 
+# Spoken when Claude can't be reached within the timeout budget - an
+# immediate apology beats seconds of dead air followed by Twilio timing
+# out and retrying the webhook
+_CLAUDE_FALLBACK = ("I'm sorry, I'm having a little trouble looking that up "
+                    "right now. Could you say that again?")
+
+def call_claude_streaming(messages: list, system_prompt: str, claude_tools: list):
+    """
+    Call Claude with the streaming API and collect the response as it arrives.
+
+    Why streaming:
+        - messages.create blocks until the entire response is generated
+        - messages.stream delivers tokens as they are produced, so the text
+          is ready the moment the last token lands instead of after an extra
+          buffering delay - on a phone call every saved moment counts
+
+    Returns:
+        Tuple of (accumulated response text, final message object).
+        The final message object is still needed so the tool-use loop can
+        inspect content blocks and conversation history can be saved.
+    """
+    text_parts = []
+
+    with _get_anthropic().messages.stream(
+        model="claude-3-5-haiku-20241022",  # Fast model for real-time responses
+        max_tokens=150,  # Reduced for faster responses
+        system=system_prompt,
+        messages=messages,
+        tools=claude_tools if claude_tools else None
+    ) as stream:
+        # Accumulate text incrementally as tokens stream in
+        for text in stream.text_stream:
+            text_parts.append(text)
+
+        # Get the fully-assembled message (includes any tool_use blocks)
+        response = stream.get_final_message()
+
+    # Confirms in CloudWatch that the cached prompt prefix is being hit
+    logger.debug("Cache read tokens: %s", response.usage.cache_read_input_tokens)
+
+    return ''.join(text_parts), response
+
 def chat_with_claude(user_message: str, session_id: str) -> str:
     """
     Send the user's message to Claude AI and get an intelligent response.
@@ -289,18 +675,55 @@ def chat_with_claude(user_message: str, session_id: str) -> str:
         -> Claude: "We have several great facials! The Hydrating Facial is..."
     """
 
-    # STEP 1: Get conversation history for context
-    # This lets Claude remember what was discussed earlier in the call
-    history = get_conversation_history(session_id)
+    # STEP 1+2: Fetch conversation history and available tools IN PARALLEL
+    # They are independent network calls (DynamoDB and the MCP Lambda), so
+    # running them serially wasted the shorter of the two round-trips on
+    # every turn. After warmup the tools future resolves instantly from
+    # the module cache.
+    history_future = _fetch_executor.submit(get_conversation_history, session_id)
+    tools_future = _fetch_executor.submit(get_claude_tools)
+
+    # Speculative tool prefetch runs alongside them - if the question
+    # obviously needs a tool, its result is ready before Claude is asked
+    prefetch_future = _fetch_executor.submit(maybe_prefetch_tool, user_message)
 
-    # STEP 2: Get available tools and format for Claude
-    # These are the "functions" Claude can use to look up spa information
-    tools = get_available_tools()
-    claude_tools = format_tools_for_claude(tools)
+    # History lets Claude remember what was discussed earlier in the call;
+    # tools are the "functions" Claude can use to look up spa information
+    history = history_future.result()
+    claude_tools = tools_future.result()
 
     # STEP 3: Build the message list for Claude
-    # Format: [previous messages..., new user message]
-    messages = history + [{'role': 'user', 'content': user_message}]
+    # Format: [compressed previous messages..., new user message]
+    # Input tokens are re-billed on every call, so the replayed history is
+    # compressed first: older turns collapse into one summary line while
+    # the last few exchanges stay verbatim (see compress_history below)
+    context = compress_history(session_id, history)
+    messages = context + [{'role': 'user', 'content': user_message}]
+
+    # If the prefetch matched, inject a synthetic tool_use/tool_result
+    # pair so Claude sees the lookup as already done and answers in one
+    # round-trip instead of Claude call -> tool -> second Claude call
+    prefetch = prefetch_future.result()
+    if prefetch:
+        tool_name, tool_args, tool_result = prefetch
+        tool_use_id = f'prefetch_{uuid.uuid4().hex}'
+        messages.append({
+            'role': 'assistant',
+            'content': [{
+                'type': 'tool_use',
+                'id': tool_use_id,
+                'name': tool_name,
+                'input': tool_args
+            }]
+        })
+        messages.append({
+            'role': 'user',
+            'content': [{
+                'type': 'tool_result',
+                'tool_use_id': tool_use_id,
+                'content': tool_result
+            }]
+        })
 
     # STEP 4: Define Claude's personality and instructions
     # This system prompt tells Claude how to behave on phone calls
@@ -322,14 +745,29 @@ IMPORTANT for phone calls:
 
 Use the tools available to get accurate service information."""
 
-    # STEP 5: Call Claude AI API
-    response = anthropic_client.messages.create(
-        model="claude-3-5-haiku-20241022",  # Fast model for real-time responses
-        max_tokens=150,  # Reduced for faster responses (was 256)
-        system=system_prompt,  # Claude's personality and instructions
-        messages=messages,  # The conversation history + new message
-        tools=claude_tools if claude_tools else None  # Available tools
-    )
+    # The system prompt never changes between calls, so send it as a
+    # cacheable block - cached reads are billed at a fraction of the
+    # normal input price and skip most of the prefill latency.
+    # (The exact prompt string must stay byte-identical for cache hits -
+    # no timestamps or per-call data in here.)
+    system_blocks = [{
+        'type': 'text',
+        'text': system_prompt,
+        'cache_control': {'type': 'ephemeral'}
+    }]
+
+    # Timeout/connection errors get a fast canned apology instead of
+    # bubbling up. Imported here (not at module top) so the TwiML-only
+    # routes keep skipping the Anthropic SDK load - this function needs
+    # the SDK regardless.
+    from anthropic import APIConnectionError, APITimeoutError
+
+    # STEP 5: Call Claude AI API (streaming - text accumulates as it arrives)
+    try:
+        streamed_text, response = call_claude_streaming(messages, system_blocks, claude_tools)
+    except (APITimeoutError, APIConnectionError) as e:
+        logger.error("Claude call timed out or failed to connect: %s", e)
+        return _CLAUDE_FALLBACK
 
     # STEP 6: Tool Use Loop
     # Claude might want to use tools to look up information before responding.
@@ -337,23 +775,21 @@ Use the tools available to get accurate service information."""
     final_text = ""
 
     while True:
-        # Process Claude's response
-        assistant_content = []
-        needs_tool_result = False
-
-        # Check each part of Claude's response
-        for content_block in response.content:
-            # Save the content block for conversation history
-            assistant_content.append(content_block.model_dump())
+        # Text for this turn was already accumulated while streaming
+        final_text += streamed_text
 
-            if content_block.type == 'text':
-                # This is text Claude wants to say to the user
-                final_text += content_block.text
-
-            elif content_block.type == 'tool_use':
-                # Claude wants to use a tool to get information
-                # Example: Claude decides it needs to call 'get_services'
-                needs_tool_result = True
+        # Process Claude's response
+        # One top-level model_dump covers every content block in a single
+        # pydantic-core (Rust) traversal - calling model_dump() per block
+        # repeated that schema walk N times for the same data. mode='json'
+        # yields plain JSON-safe dicts ready for the history store.
+        assistant_content = response.model_dump(mode='json')['content']
+
+        # Does Claude want to use a tool to get information first?
+        # Example: Claude decides it needs to call 'get_services'
+        needs_tool_result = any(
+            content_block.type == 'tool_use' for content_block in response.content
+        )
 
         # Add Claude's response to conversation history
         messages.append({'role': 'assistant', 'content': assistant_content})
@@ -382,28 +818,33 @@ Use the tools available to get accurate service information."""
 
             # STEP 8: Call Claude again with the tool results
             # Now Claude has the information and can formulate a natural response
-            response = anthropic_client.messages.create(
-                model="claude-3-5-haiku-20241022",
-                max_tokens=150,  # Reduced for faster responses
-                system=system_prompt,
-                messages=messages,
-                tools=claude_tools if claude_tools else None
-            )
+            try:
+                streamed_text, response = call_claude_streaming(messages, system_blocks, claude_tools)
+            except (APITimeoutError, APIConnectionError) as e:
+                logger.error("Claude call timed out or failed to connect: %s", e)
+                # Keep any text already streamed before the failure
+                return final_text or _CLAUDE_FALLBACK
             # Loop continues - check if Claude needs more tools or has final answer
         else:
             # Claude has everything it needs and gave a final text response
             break
 
     # STEP 9: Save the conversation for next time
-    # Only keep the new messages from this interaction
-    new_messages = messages[len(history):]
+    # Only keep the new messages from this interaction - everything after
+    # the (possibly compressed) context is what this turn added
+    new_messages = messages[len(context):]
     updated_history = history + new_messages
 
     # Store only recent messages to keep voice conversations lightweight
     # IMPORTANT: We need to be careful not to break tool_use/tool_result pairs
     # when trimming. We'll keep complete user/assistant exchanges.
     trimmed_history = trim_conversation_history(updated_history, max_pairs=5)
-    save_conversation_history(session_id, trimmed_history)
+
+    # Fire the save in the background - the handler flushes it just
+    # before returning, after the TwiML work has overlapped the write
+    _pending_saves.append(
+        _save_executor.submit(save_conversation_history, session_id, trimmed_history)
+    )
 
     # Return Claude's response to be spoken to the caller
     return final_text
@@ -431,20 +872,177 @@ def trim_conversation_history(messages: list, max_pairs: int = 5) -> list:
     if len(messages) <= max_pairs * 2:
         return messages
 
-    # Start from the end and work backwards, keeping complete pairs
-    # We want to keep the most recent max_pairs exchanges
-    # Each "exchange" is typically 2 messages (user + assistant)
-    # But can be 4 if tools are involved (user, assistant with tool_use, user with tool_result, assistant with final response)
+    # Walk backwards counting exchanges. An exchange starts at a plain
+    # user message (string content) - starting the kept window on a
+    # tool_result (list content) would orphan it from the assistant
+    # tool_use it answers, which the Claude API rejects.
+    start = len(messages)
+    kept = 0
+    for i in range(len(messages) - 1, -1, -1):
+        msg = messages[i]
+        if msg.get('role') == 'user' and isinstance(msg.get('content'), str):
+            start = i
+            kept += 1
+            if kept == max_pairs:
+                break
+
+    if start == len(messages):
+        # No plain user message found (shouldn't happen) - keep the tail
+        return messages[-(max_pairs * 2):]
+
+    return messages[start:]
+
+def _summarize_messages(messages: list) -> str:
+    """
+    Generate a one-line summary of older conversation turns with Haiku.
+
+    Only the human-readable text is summarized - tool_use/tool_result
+    blocks are raw JSON that would bloat the summarization prompt without
+    adding meaning (the caller never heard them).
+
+    Returns an empty string on failure so the caller can fall back to
+    sending the uncompressed history.
+    """
+    lines = []
+    for msg in messages:
+        content = msg.get('content')
+        if isinstance(content, str):
+            lines.append(f"{msg['role']}: {content}")
+        elif isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict) and block.get('type') == 'text':
+                    lines.append(f"{msg['role']}: {block['text']}")
+
+    try:
+        response = _get_anthropic().messages.create(
+            model="claude-3-5-haiku-20241022",
+            max_tokens=100,
+            system="Summarize this spa phone call in one short sentence: "
+                   "what the caller wants and any services or prices discussed.",
+            messages=[{'role': 'user', 'content': '\n'.join(lines) or '(no dialogue)'}]
+        )
+        return ' '.join(
+            block.text for block in response.content if block.type == 'text'
+        ).strip()
+    except Exception as e:
+        logger.error("Error summarizing call history: %s", e)
+        return ''
+
+def compress_history(session_id: str, history: list) -> list:
+    """
+    Shrink the history replayed to Claude without losing the thread.
+
+    Claude re-reads (and we re-pay for) the full message list on every
+    turn, so a long call makes each prefill slower and more expensive.
+    Instead of sending everything:
+    - the last SUMMARY_KEEP_PAIRS complete exchanges stay verbatim
+    - everything older is replaced with a single summary line
+
+    The summary is generated once - the first time the call grows past
+    SUMMARY_TRIGGER_MESSAGES - then cached in _session_summaries and
+    persisted with the next history save, so later turns reuse it at
+    zero cost.
+    """
+    if len(history) <= SUMMARY_TRIGGER_MESSAGES:
+        return history
+
+    # Reuse the trimmer to find the recent complete exchanges
+    recent = trim_conversation_history(history, max_pairs=SUMMARY_KEEP_PAIRS)
+    older = history[:len(history) - len(recent)]
+    if not older:
+        return history
+
+    summary = _session_summaries.get(session_id)
+    if not summary:
+        summary = _summarize_messages(older)
+        if not summary:
+            # Summarization failed - better to send the full history than
+            # to silently drop what was discussed
+            return history
+        # Persisted to DynamoDB by the next save_conversation_history
+        _session_summaries[session_id] = summary
+
+    return [{'role': 'user', 'content': f'[Earlier call summary: {summary}]'}] + recent
+
+# ============================================================================
+# EARLY PLAYBACK - Speak the first sentence while the rest waits
+# ============================================================================
+# Twilio synthesizes the whole <Say> before the caller hears anything, so a
+# long answer means a long silence. Instead we speak just the first
+# sentence, stash the rest on the conversation item, and <Redirect> to
+# /voice/continue which plays the remainder - the caller hears the first
+# words as soon as one short sentence is synthesized.
+
+# Matches the whitespace after sentence-ending punctuation
+_SENTENCE_END = re.compile(r'(?<=[.?!])\s+')
+
+def split_first_sentence(text: str) -> tuple:
+    """Split a response into (first sentence, remainder)"""
+    parts = _SENTENCE_END.split(text.strip(), maxsplit=1)
+    if len(parts) == 2:
+        return parts[0], parts[1]
+    return parts[0], ''
+
+def stash_pending_speech(call_sid: str, text: str) -> bool:
+    """Store the not-yet-spoken part of a response for /voice/continue"""
+    try:
+        _get_conversations_table().update_item(
+            Key={'session_id': call_sid},
+            UpdateExpression='SET pending_speech = :text',
+            ExpressionAttributeValues={':text': text}
+        )
+        return True
+    except Exception as e:
+        # If the stash fails we just speak the whole response at once
+        logger.error("Error stashing pending speech: %s", e)
+        return False
 
-    # Simple approach: keep last (max_pairs * 4) messages to be safe
-    # This ensures we don't break any tool use/result chains
-    keep_count = max_pairs * 4
-    return messages[-keep_count:]
+def pop_pending_speech(call_sid: str) -> str:
+    """Fetch and clear the stashed remainder of the last response"""
+    try:
+        response = _get_conversations_table().update_item(
+            Key={'session_id': call_sid},
+            UpdateExpression='REMOVE pending_speech',
+            ReturnValues='ALL_OLD'
+        )
+        return response.get('Attributes', {}).get('pending_speech', '')
+    except Exception as e:
+        logger.error("Error fetching pending speech: %s", e)
+        return ''
 
 # ============================================================================
 # TWILIO TWIML GENERATION - Phone Call Control
 # ============================================================================
 
+# Precompiled TwiML templates - the XML around the spoken message never
+# changes, so it's built once here instead of re-concatenated per call.
+# Each speaks via Amazon Polly's "Joanna" voice, then either:
+#   gather   = listen for the caller's next utterance
+#   continue = redirect to /voice/continue to speak a stashed remainder
+#   hangup   = end the call
+_TWIML_TEMPLATES = {
+    'gather': (
+        '<?xml version="1.0" encoding="UTF-8"?><Response>'
+        '<Say voice="Polly.Joanna">%s</Say>'
+        '<Gather input="speech" action="/voice/process" method="POST" '
+        'speechTimeout="2" language="en-US"/>'
+        '<Redirect>/voice/gather</Redirect>'
+        '</Response>'
+    ),
+    'continue': (
+        '<?xml version="1.0" encoding="UTF-8"?><Response>'
+        '<Say voice="Polly.Joanna">%s</Say>'
+        '<Redirect>/voice/continue</Redirect>'
+        '</Response>'
+    ),
+    'hangup': (
+        '<?xml version="1.0" encoding="UTF-8"?><Response>'
+        '<Say voice="Polly.Joanna">%s</Say>'
+        '<Hangup/>'
+        '</Response>'
+    ),
+}
+
 def generate_twiml(message: str, next_action: str = 'gather') -> str:
     """
     Generate TwiML (Twilio Markup Language) to control the phone call.
@@ -457,48 +1055,55 @@ def generate_twiml(message: str, next_action: str = 'gather') -> str:
 
     Args:
         message: The text to speak to the caller
-        next_action: What to do after speaking
-                    'gather' = listen for user response (default)
-                    'hangup' = end the call
+        next_action: What to do after speaking - 'gather' (default),
+                     'continue', or 'hangup' (see _TWIML_TEMPLATES)
 
     Returns:
         XML string that Twilio will execute
 
-    Example output:
-        <?xml version="1.0" encoding="UTF-8"?>
-        <Response>
-            <Say voice="Polly.Joanna">Hello! How can I help?</Say>
-            <Gather input="speech" action="/voice/process" method="POST" speechTimeout="2" language="en-US"/>
-            <Redirect>/voice/gather</Redirect>
-        </Response>
+    The message is XML-escaped: Claude's output can contain '&', '<' or
+    quotes, which would otherwise produce invalid TwiML and make Twilio
+    fail the response and retry the webhook.
     """
-    # Start the TwiML response
-    twiml = '<?xml version="1.0" encoding="UTF-8"?><Response>'
-
-    # Speak the message using Amazon Polly's "Joanna" voice
-    twiml += f'<Say voice="Polly.Joanna">{message}</Say>'
-
-    if next_action == 'gather':
-        # Listen for the caller to speak
-        # When they finish, POST the transcription to /voice/process
-        twiml += '<Gather input="speech" action="/voice/process" method="POST" '
-        twiml += 'speechTimeout="2" language="en-US"/>'
-
-        # If no input after timeout, redirect to /voice/gather to try again
-        twiml += '<Redirect>/voice/gather</Redirect>'
-
-    elif next_action == 'hangup':
-        # End the phone call
-        twiml += '<Hangup/>'
-
-    # Close the response
-    twiml += '</Response>'
-    return twiml
+    template = _TWIML_TEMPLATES.get(next_action, _TWIML_TEMPLATES['gather'])
+    return template % escape(message)
 
 # ============================================================================
 # LAMBDA HANDLER - Main Entry Point
 # ============================================================================
 
+# Farewell phrases that end the call without asking Claude - a frozenset
+# gives O(1) exact-match lookup, and the startswith pass below catches
+# variants like "thanks so much". The goodbye turn is typically the last
+# turn of every call, so skipping the LLM round-trip here saves hundreds
+# of milliseconds on a path where the caller is already hanging up.
+_GOODBYE_SET = frozenset([
+    'bye', 'goodbye', 'bye bye', 'thanks', 'thank you',
+    "that's all", 'that is all', 'no thanks', 'no thank you',
+])
+
+_GOODBYE_PREFIXES = ('bye', 'goodbye', 'thanks', 'thank you')
+
+_FAREWELL_MESSAGE = "Thank you for calling Sally's Spa. Have a wonderful day!"
+
+# A farewell prefix only counts on utterances this short - "thanks, and
+# how late are you open Saturday?" opens with thanks but still needs an
+# answer from Claude
+_GOODBYE_MAX_WORDS = 3
+
+def is_goodbye(speech: str) -> bool:
+    """Check whether the caller is ending the call"""
+    lower = speech.lower().strip().rstrip('.!')
+    if lower in _GOODBYE_SET:
+        return True
+    # Prefix match is restricted to short utterances so a question that
+    # merely starts with thanks isn't hung up on; "thanks so much" and
+    # "bye now" still short-circuit
+    return (
+        len(lower.split()) <= _GOODBYE_MAX_WORDS
+        and any(lower.startswith(w) for w in _GOODBYE_PREFIXES)
+    )
+
 def lambda_handler(event, context):
     """
     Main entry point for the Lambda function.
@@ -521,7 +1126,7 @@ def lambda_handler(event, context):
     """
 
     # Log the incoming request for debugging
-    print(f"Event: {json.dumps(event)}")
+    logger.debug("Event: %s", event)
 
     # Extract the URL path (e.g., '/voice/incoming', '/voice/process')
     path = event.get('path', '/')
@@ -536,13 +1141,10 @@ def lambda_handler(event, context):
     if event.get('isBase64Encoded', False):
         body = base64.b64decode(body).decode('utf-8')
 
-    if body:
-        # parse_qs returns dict with arrays as values
-        params = parse_qs(body)
-        # Get first value from each array (Twilio only sends one value per field)
-        params = {k: v[0] if isinstance(v, list) else v for k, v in params.items()}
-    else:
-        params = {}
+    # parse_qsl yields flat (key, value) pairs - Twilio never sends
+    # multi-value fields, so there's no need for parse_qs's
+    # dict-of-lists plus a second pass to unwrap each one-element list
+    params = dict(parse_qsl(body, keep_blank_values=True)) if body else {}
 
     # Get the unique call identifier from Twilio
     # We use this as the session_id to track conversation history
@@ -591,7 +1193,19 @@ def lambda_handler(event, context):
         # Example: "What facials do you have?"
         speech_result = params.get('SpeechResult', '')
 
-        print(f"User said: {speech_result}")
+        logger.info("User said: %s", speech_result)
+
+        # Callers saying goodbye don't need an LLM-crafted reply - a canned
+        # farewell ends the call immediately instead of paying a Claude
+        # round-trip just to say goodbye back
+        if speech_result and is_goodbye(speech_result):
+            twiml = generate_twiml(_FAREWELL_MESSAGE, next_action='hangup')
+
+            return {
+                'statusCode': 200,
+                'headers': {'Content-Type': 'application/xml'},
+                'body': twiml
+            }
 
         if speech_result:
             try:
@@ -599,23 +1213,31 @@ def lambda_handler(event, context):
                 # This is where the magic happens - Claude uses tools to look up
                 # services and generates a natural, helpful response
                 ai_response = chat_with_claude(speech_result, call_sid)
-                print(f"AI response: {ai_response}")
+                logger.info("AI response: %s", ai_response)
 
-                # Check if the caller is saying goodbye
+                # Fallback goodbye check for farewells buried mid-sentence
+                # ("sounds great, bye now") that the fast-path prefix match
+                # above didn't catch - here we still speak Claude's reply
                 lower_speech = speech_result.lower()
                 if any(word in lower_speech for word in ['bye', 'goodbye', 'thanks', 'thank you', 'that\'s all']):
                     # End the call gracefully
                     twiml = generate_twiml(
-                        f"{ai_response} Thank you for calling Sally's Spa. Have a wonderful day!",
+                        f"{ai_response} {_FAREWELL_MESSAGE}",
                         next_action='hangup'
                     )
                 else:
-                    # Continue the conversation - wait for next question
-                    twiml = generate_twiml(ai_response, next_action='gather')
+                    # Speak the first sentence right away; longer answers
+                    # stash the rest for /voice/continue so the caller
+                    # isn't waiting on synthesis of the whole paragraph
+                    first_sentence, remainder = split_first_sentence(ai_response)
+                    if remainder and stash_pending_speech(call_sid, remainder):
+                        twiml = generate_twiml(first_sentence, next_action='continue')
+                    else:
+                        twiml = generate_twiml(ai_response, next_action='gather')
 
             except Exception as e:
                 # Something went wrong (Claude API error, Lambda timeout, etc.)
-                print(f"Error: {e}")
+                logger.error("Error: %s", e)
                 twiml = generate_twiml(
                     "I'm sorry, I'm having trouble right now. Please try again.",
                     next_action='gather'
@@ -627,6 +1249,32 @@ def lambda_handler(event, context):
                 next_action='gather'
             )
 
+        # Let the write-behind history save land before Lambda freezes us
+        flush_pending_saves()
+
+        return {
+            'statusCode': 200,
+            'headers': {'Content-Type': 'application/xml'},
+            'body': twiml
+        }
+
+    # ========================================================================
+    # ROUTE 4: Continue a Long Response
+    # ========================================================================
+    # Our own TwiML redirects here after speaking the first sentence of a
+    # long answer - we play the stashed remainder and then listen again
+    elif path == '/voice/continue':
+        remaining = pop_pending_speech(call_sid)
+
+        if remaining:
+            twiml = generate_twiml(remaining, next_action='gather')
+        else:
+            # Nothing stashed (e.g., DynamoDB hiccup) - just prompt again
+            twiml = generate_twiml(
+                "What else can I help you with?",
+                next_action='gather'
+            )
+
         return {
             'statusCode': 200,
             'headers': {'Content-Type': 'application/xml'},
@@ -634,7 +1282,7 @@ def lambda_handler(event, context):
         }
 
     # ========================================================================
-    # ROUTE 4: Unknown Path
+    # ROUTE 5: Unknown Path
     # ========================================================================
     else:
         # Someone accessed an invalid URL
@@ -39,6 +39,11 @@ resource "aws_dynamodb_table" "conversations" {
     name = "session_id"
     type = "S"
   }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
 }
 
 # IAM Role for Lambda
@@ -87,7 +92,9 @@ resource "aws_iam_role_policy" "lambda_policy" {
         Action = [
           "dynamodb:GetItem",
           "dynamodb:PutItem",
-          "dynamodb:Query"
+          "dynamodb:UpdateItem",
+          "dynamodb:Query",
+          "dynamodb:DescribeTable"
         ]
         Resource = aws_dynamodb_table.conversations.arn
       },
@@ -136,6 +143,7 @@ resource "aws_lambda_function" "chat_handler" {
       ANTHROPIC_API_KEY   = var.anthropic_api_key
       MCP_LAMBDA_NAME     = aws_lambda_function.mcp_tools.function_name
       CONVERSATIONS_TABLE = aws_dynamodb_table.conversations.name
+      BUCKET_NAME         = aws_s3_bucket.spa_data.id # for in-process spa_tools
     }
   }
 
@@ -151,6 +159,7 @@ resource "aws_lambda_function" "voice_handler" {
   runtime       = "python3.11"
   timeout       = 60
   memory_size   = 512
+  publish       = true # versions are needed for provisioned concurrency
 
   environment {
     variables = {
@@ -163,6 +172,21 @@ resource "aws_lambda_function" "voice_handler" {
   source_code_hash = filebase64sha256("../lambda-packages/voice-lambda.zip")
 }
 
+# Keep warm voice Lambda instances ready - cold starts (SDK imports +
+# client init) land directly on a caller's first webhook otherwise
+resource "aws_lambda_alias" "voice_live" {
+  name             = "live"
+  function_name    = aws_lambda_function.voice_handler.function_name
+  function_version = aws_lambda_function.voice_handler.version
+}
+
+resource "aws_lambda_provisioned_concurrency_config" "voice" {
+  count                             = var.voice_provisioned_concurrency > 0 ? 1 : 0
+  function_name                     = aws_lambda_function.voice_handler.function_name
+  qualifier                         = aws_lambda_alias.voice_live.name
+  provisioned_concurrent_executions = var.voice_provisioned_concurrency
+}
+
 # API Gateway
 resource "aws_apigatewayv2_api" "spa_api" {
   name          = "spa-chat-api"
@@ -194,7 +218,7 @@ resource "aws_apigatewayv2_route" "chat_route" {
 resource "aws_apigatewayv2_integration" "voice_integration" {
   api_id             = aws_apigatewayv2_api.spa_api.id
   integration_type   = "AWS_PROXY"
-  integration_uri    = aws_lambda_function.voice_handler.invoke_arn
+  integration_uri    = aws_lambda_alias.voice_live.invoke_arn
   payload_format_version = "1.0"
 }
 
@@ -217,6 +241,12 @@ resource "aws_apigatewayv2_route" "voice_process" {
   target    = "integrations/${aws_apigatewayv2_integration.voice_integration.id}"
 }
 
+resource "aws_apigatewayv2_route" "voice_continue" {
+  api_id    = aws_apigatewayv2_api.spa_api.id
+  route_key = "POST /voice/continue"
+  target    = "integrations/${aws_apigatewayv2_integration.voice_integration.id}"
+}
+
 # Default stage
 resource "aws_apigatewayv2_stage" "default" {
   api_id      = aws_apigatewayv2_api.spa_api.id
@@ -237,6 +267,7 @@ resource "aws_lambda_permission" "api_gateway_voice" {
   statement_id  = "AllowAPIGatewayInvokeVoice"
   action        = "lambda:InvokeFunction"
   function_name = aws_lambda_function.voice_handler.function_name
+  qualifier     = aws_lambda_alias.voice_live.name
   principal     = "apigateway.amazonaws.com"
   source_arn    = "${aws_apigatewayv2_api.spa_api.execution_arn}/*/*"
 }
@@ -9,3 +9,9 @@ variable "anthropic_api_key" {
   type        = string
   sensitive   = true
 }
+
+variable "voice_provisioned_concurrency" {
+  description = "Provisioned concurrency for the voice Lambda (0 disables it)"
+  type        = number
+  default     = 1
+}